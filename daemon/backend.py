@@ -5,50 +5,106 @@ daemon.backend
 Refactored backend daemon — same external API, rewritten internals.
 """
 
+import asyncio
+import multiprocessing as mp
+import signal
 import socket
-import threading
+import sys
 import argparse
 
+try:
+    import uvloop  # optional: libuv-based drop-in event loop
+except ImportError:
+    uvloop = None
+
 from .response import *  # keep side-effect/compat imports
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict  # noqa: F401
 
 
-def handle_client(ip, port, conn, addr, routes):
+async def handle_client(ip, port, conn, addr, routes):
     """
     Instantiate HttpAdapter and delegate the whole request lifecycle.
     """
     adapter = HttpAdapter(ip, port, conn, addr, routes)
-    adapter.handle_client(conn, addr, routes)
+    await adapter.handle_client(conn, addr, routes)
 
 
-def run_backend(ip, port, routes):
+async def serve(ip, port, routes, reuse_port=False):
     """
-    Bind a TCP socket and accept clients concurrently via threads.
+    Bind a non-blocking TCP socket and multiplex clients on one event loop.
+
+    Each accepted connection becomes a task; no OS thread is created per
+    client. Raw sockets (rather than streams) are kept so the adapter can
+    still reach socket-level options and zero-copy sends.
+
+    ``reuse_port`` sets SO_REUSEPORT so sibling worker processes can bind
+    the same port. It is off for a single worker, so a second server started
+    on a busy port still fails with EADDRINUSE.
     """
+    loop = asyncio.get_running_loop()
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         server.bind((ip, port))
         server.listen(50)
+        server.setblocking(False)
 
         print("[Backend] Listening on port {}".format(port))
         if routes:
             print("[Backend] route settings {}".format(routes))
 
+        # keep strong refs so running tasks are not garbage-collected
+        tasks = set()
         while True:
-            conn, addr = server.accept()
-            t = threading.Thread(
-                target=handle_client,
-                args=(ip, port, conn, addr, routes),
-                daemon=True,
-            )
-            t.start()
+            conn, addr = await loop.sock_accept(server)
+            # responses are written whole; don't hold them back for Nagle
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            task = loop.create_task(handle_client(ip, port, conn, addr, routes))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        server.close()
+
+
+def _run_loop(ip, port, routes, reuse_port=False):
+    try:
+        if uvloop is not None:
+            uvloop.run(serve(ip, port, routes, reuse_port))
+        else:
+            asyncio.run(serve(ip, port, routes, reuse_port))
     except socket.error as e:
         print("Socket error: {}".format(e))
 
 
-def create_backend(ip, port, routes={}):
+def run_backend(ip, port, routes, workers=1):
+    """
+    Run the backend event loop until interrupted.
+
+    With ``workers > 1`` that many processes each bind the port with
+    SO_REUSEPORT and the kernel spreads new connections across them. This
+    needs ``fork`` and SO_REUSEPORT; elsewhere a single process is used.
+    Workers are separate processes: app state (module globals) is not
+    shared between them.
+    """
+    reuse_port = False
+    if workers > 1:
+        if hasattr(socket, "SO_REUSEPORT") and "fork" in mp.get_all_start_methods():
+            ctx = mp.get_context("fork")
+            for _ in range(workers - 1):
+                ctx.Process(target=_run_loop, args=(ip, port, routes, True), daemon=True).start()
+            reuse_port = True
+            # exit normally on SIGTERM so multiprocessing reaps the workers
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        else:
+            print("[Backend] SO_REUSEPORT/fork unavailable; running one worker")
+    _run_loop(ip, port, routes, reuse_port)
+
+
+def create_backend(ip, port, routes={}, workers=1):
     """
     Public entrypoint kept for compatibility with start scripts.
     """
-    run_backend(ip, port, routes)
+    run_backend(ip, port, routes, workers)
@@ -1,33 +1,66 @@
 # Case-insensitive dict compatible with the original API.
-try:
-    from collections.abc import MutableMapping
-except ImportError:
-    from collections import MutableMapping
 
 
-class CaseInsensitiveDict(MutableMapping):
+class CaseInsensitiveDict(dict):
     """
-    Dict-like container with case-insensitive keys.
+    Dict with case-insensitive keys; keys are stored lowercased so lookups
+    hit the dict slots directly.
     """
 
-    def __init__(self, *args, **kwargs):
-        self._store = {}
-        self.update(dict(*args, **kwargs))
+    def __init__(self, other=(), **kwargs):
+        if isinstance(other, CaseInsensitiveDict):
+            # keys are already lowercased; copy the slots as they are
+            super().__init__(other)
+        elif other:
+            items = other.items() if hasattr(other, "items") else other
+            super().__init__({k.lower(): v for k, v in items})
+        if kwargs:
+            super().update({k.lower(): v for k, v in kwargs.items()})
 
     def __getitem__(self, key):
-        return self._store[key.lower()]
+        return super().__getitem__(key.lower())
 
     def __setitem__(self, key, value):
-        self._store[key.lower()] = value
+        super().__setitem__(key.lower(), value)
 
     def __delitem__(self, key):
-        del self._store[key.lower()]
+        super().__delitem__(key.lower())
 
-    def __iter__(self):
-        return iter(self._store)
+    def __contains__(self, key):
+        return super().__contains__(key.lower())
 
-    def __len__(self):
-        return len(self._store)
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
 
-    def __repr__(self):
-        return repr(self._store)
+    def setdefault(self, key, default=None):
+        return super().setdefault(key.lower(), default)
+
+    def pop(self, key, *default):
+        return super().pop(key.lower(), *default)
+
+    def copy(self):
+        return CaseInsensitiveDict(self)
+
+    def __or__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = CaseInsensitiveDict(self)
+        merged.update(other)
+        return merged
+
+    def __ror__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = CaseInsensitiveDict(other)
+        merged.update(self)
+        return merged
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, other=(), **kwargs):
+        items = other.items() if hasattr(other, "items") else other
+        super().update({k.lower(): v for k, v in items})
+        if kwargs:
+            super().update({k.lower(): v for k, v in kwargs.items()})
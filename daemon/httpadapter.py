@@ -6,11 +6,73 @@ Rewritten HttpAdapter. Preserves public surface & utility helpers that
 your app already calls (including login/protected helpers).
 """
 
+import asyncio
+import concurrent.futures
+import inspect
+import os
+
+try:
+    import orjson as _json
+    _dumps = _json.dumps
+except ImportError:  # stdlib fallback; same bytes-out contract
+    import json as _json
+
+    def _dumps(obj):
+        return _json.dumps(obj, separators=(",", ":")).encode()
+
 from .request import Request
-from .response import Response
+from .response import Response, _send_parts
 from .dictionary import CaseInsensitiveDict  # noqa: F401
 
 
+#: Largest request head (request line + headers) accepted, in bytes.
+MAX_HEADER_SIZE = 64 * 1024
+#: Largest request body accepted, in bytes; checked against Content-Length
+#: before any buffer is grown.
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+class _RequestTooLarge(Exception):
+    """Raised by ``read_request``; carries the status to reply with."""
+
+    def __init__(self, status, reason):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+#: Upper bound on threads running route handlers in one process.
+HOOK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_hook_pool = None
+
+
+def _get_hook_pool():
+    """The process's handler pool, created on first use (so after any fork)."""
+    global _hook_pool
+    if _hook_pool is None:
+        _hook_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=HOOK_WORKERS, thread_name_prefix="hook")
+    return _hook_pool
+
+
+def build_dispatch(hook):
+    """
+    Return ``dispatch(req)`` that calls ``hook`` with the argument its
+    signature asks for: ``body=req.body``, the Request as ``req``, or nothing.
+    """
+    try:
+        # numba dispatchers keep the original function as ``py_func``
+        params = inspect.signature(getattr(hook, "py_func", hook)).parameters
+    except (TypeError, ValueError):
+        params = {}
+
+    if "body" in params:
+        return lambda req: hook(body=req.body)
+    if "req" in params:
+        return lambda req: hook(req)
+    return lambda req: hook()
+
+
 class HttpAdapter:
     """
     Request–response orchestrator for one client connection.
@@ -29,25 +91,120 @@ class HttpAdapter:
         self.routes = routes
         self.request = Request()
         self.response = Response()
+        # one receive buffer per connection, reused across recv_into calls
+        self._buf = bytearray(8192)
+        self._view = memoryview(self._buf)
 
-    def handle_client(self, conn, addr, routes):
+    async def handle_client(self, conn, addr, routes):
         """
-        1) recv raw, 2) parse → Request, 3) hook/login/protected/static, 4) send.
+        1) recv raw, 2) handle_request → packet, 3) send, 4) close.
         """
         self.conn = conn
         self.connaddr = addr
-
-        req = self.request
-        resp = self.response
+        self.routes = routes
+        loop = asyncio.get_running_loop()
 
         try:
-            raw = conn.recv(1024).decode()
+            raw = await self.read_request(loop, conn)
             if not raw:
                 # client closed early; nothing to do
-                conn.close()
                 return
+            if routes:
+                # app handlers may block (locks, I/O); run them on the
+                # bounded pool so the event loop keeps serving other sockets
+                out = await loop.run_in_executor(_get_hook_pool(), self.handle_request, raw)
+            else:
+                out = self.handle_request(raw)
+            if isinstance(out, Response):
+                await out.send(conn, self.request)
+            elif isinstance(out, tuple):
+                # (header, body): one gather write, no concatenated copy
+                await _send_parts(loop, conn, out)
+            else:
+                await loop.sock_sendall(conn, out)
+        except _RequestTooLarge as e:
+            print("[HttpAdapter] Rejected request from {}: {}".format(addr, e.reason))
+            try:
+                await loop.sock_sendall(conn, self.build_error_response(e.status, e.reason))
+            except OSError:
+                pass
+        except (OSError, MemoryError, ValueError) as e:
+            print("[HttpAdapter] Connection error {}: {}".format(addr, e))
+        except Exception as e:
+            # last resort for bugs past handle_request (e.g. in Response.send)
+            print("[HttpAdapter] Error handling {}: {}".format(addr, e))
+            try:
+                await loop.sock_sendall(conn, self.build_error_response(
+                    500, "Internal Server Error"))
+            except OSError:
+                pass
+        finally:
+            conn.close()
+
+    async def read_request(self, loop, conn):
+        """
+        Read one full request into the adapter's reusable buffer: headers up
+        to the blank line, then exactly ``Content-Length`` body bytes.
+
+        :raise _RequestTooLarge: head over MAX_HEADER_SIZE or declared body
+               over MAX_BODY_SIZE.
+        """
+        off = 0
+        end = -1
+        while end < 0:
+            if off == len(self._buf):
+                if off >= MAX_HEADER_SIZE:
+                    raise _RequestTooLarge(431, "Request Header Fields Too Large")
+                self._grow(min(2 * off, MAX_HEADER_SIZE))
+            n = await loop.sock_recv_into(conn, self._view[off:])
+            if not n:
+                return bytes(self._view[:off])
+            # only rescan the tail that may complete the blank line
+            end = self._buf.find(b"\r\n\r\n", max(0, off - 3), off + n)
+            off += n
+
+        length = self._content_length(end)
+        if length > MAX_BODY_SIZE:
+            raise _RequestTooLarge(413, "Payload Too Large")
+        total = end + 4 + length
+        if total > len(self._buf):
+            self._grow(total)
+        while off < total:
+            n = await loop.sock_recv_into(conn, self._view[off:total])
+            if not n:
+                break
+            off += n
+        return bytes(self._view[:min(off, total)])
 
-            req.prepare(raw, routes)
+    def _content_length(self, end):
+        """Content-Length from the header span ``_buf[:end]`` (0 if absent)."""
+        head = self._buf[:end].lower()
+        i = head.find(b"\r\ncontent-length:")
+        if i < 0:
+            return 0
+        j = head.find(b"\r\n", i + 2)
+        try:
+            return max(0, int(head[i + 17:j if j >= 0 else end]))
+        except ValueError:
+            return 0
+
+    def _grow(self, size):
+        """Enlarge the receive buffer to at least ``size`` bytes."""
+        self._view.release()
+        self._buf.extend(bytes(size - len(self._buf)))
+        self._view = memoryview(self._buf)
+
+    def handle_request(self, raw):
+        """
+        Parse → Request, run hook/login/protected/static. Returns the packet
+        bytes, a ``(header, body)`` pair for hook replies, or the Response
+        itself when it should stream a static file.
+        """
+        req = self.request
+        resp = self.response
+
+        try:
+            req.prepare(raw, self.routes)
 
             # --- priority 1: RESTful hook (apps/sampleApp routes) ---
             if req.hook:
@@ -57,55 +214,46 @@ class HttpAdapter:
                 ))
                 result = self._call_hook(req)
 
-                # Allow hook to return Response or plain/dict
+                # Allow hook to return Response, dict, JSON bytes or plain text
                 if isinstance(result, Response):
-                    packet = result.build_response(req)
+                    return result.build_response(req)
+                if isinstance(result, dict):
+                    body = _dumps(result)
+                    ctype = b"application/json"
+                elif isinstance(result, (bytes, bytearray, memoryview)):
+                    # already serialized by the app; sent without re-encoding
+                    # or copying (a view is flattened so len() counts bytes)
+                    body = result.cast("B") if isinstance(result, memoryview) else result
+                    ctype = b"application/json"
                 else:
-                    if isinstance(result, dict):
-                        body = str(result)
-                        head = "HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
-                    else:
-                        body = str(result)
-                        head = "HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
-                    packet = (head + "Content-Length: {}\r\n\r\n{}".format(len(body), body)).encode()
-
-                conn.sendall(packet)
-                conn.close()
-                return
+                    body = str(result).encode()
+                    ctype = b"text/plain"
+                return b"HTTP/1.1 200 OK\r\nContent-Type: %b\r\nContent-Length: %d\r\n\r\n" % (
+                    ctype, len(body)), body
 
             # --- priority 2: explicit login path (Task 1A) ---
             if req.method == "POST" and req.path == "/login":
-                conn.sendall(self.handle_login(req, resp))
-                conn.close()
-                return
+                return self.handle_login(req, resp)
 
             # --- priority 3: protected resources (Task 1B) ---
             if req.path in ("/", "/index.html"):
-                conn.sendall(self.handle_protected_route(req, resp))
-                conn.close()
-                return
+                return self.handle_protected_route(req, resp)
 
-            # --- default: serve static via Response factory ---
-            conn.sendall(resp.build_response(req))
+            # --- default: serve static via Response.send ---
+            return resp
 
         except Exception as e:
-            conn.sendall(self.build_error_response(500, "Internal Server Error: {}".format(e)))
-        finally:
-            conn.close()
+            return self.build_error_response(500, "Internal Server Error: {}".format(e))
 
     # -------------------- helpers --------------------
 
     def _call_hook(self, req):
-        """Call route function with a flexible signature."""
-        hook = req.hook
-        names = getattr(hook, "__code__", None)
-        names = names.co_varnames if names else ()
-
-        if "body" in names:
-            return hook(body=req.body)
-        if "req" in names:
-            return hook(req)
-        return hook()
+        """Call route function through the dispatcher bound at registration."""
+        dispatch = getattr(req.hook, "_dispatch", None)
+        if dispatch is None:
+            # hook registered without WeApRous.route (plain routes dict)
+            dispatch = build_dispatch(req.hook)
+        return dispatch(req)
 
     @property
     def extract_cookies(self):
@@ -136,7 +284,10 @@ class HttpAdapter:
     # -------------------- Task 1A / 1B helpers kept by name --------------------
 
     def handle_login(self, req, resp):
-        """Authenticate /login (admin/password) and set cookie."""
+        """Authenticate /login (admin/password) and set cookie.
+
+        Returns the Response to stream on success, error bytes otherwise.
+        """
         form = req.parse_form_data()
         user = form.get("username", "")
         pw = form.get("password", "")
@@ -146,16 +297,16 @@ class HttpAdapter:
             resp.set_cookie("auth", "true")
             resp.status_code = 200
             req.path = "/index.html"
-            return resp.build_response(req)
+            return resp
 
         return self.build_error_response(401, "Unauthorized")
 
     def handle_protected_route(self, req, resp):
-        """Guard index or root by cookie."""
+        """Guard index or root by cookie (Response on success, as above)."""
         if req.cookies.get("auth") == "true":
             if req.path == "/":
                 req.path = "/index.html"
-            return resp.build_response(req)
+            return resp
         return self.build_error_response(401, "Unauthorized - Please login first")
 
     def build_error_response(self, status_code, message):
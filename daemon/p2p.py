@@ -1,12 +1,98 @@
 #
 # p2p.py – Clean P2P client built from your original
 #
+# Wire format: each message is a 4-byte big-endian length followed by that
+# many bytes of UTF-8 JSON, so one TCP connection carries many messages.
+#
 
+import multiprocessing as mp
+import queue
+import selectors
 import socket
-import threading
-import json
+import struct
 import time
 
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:  # stdlib fallback; json.loads accepts bytes too
+    import json
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+_FRAME_HDR = struct.Struct(">I")
+
+#: Largest frame body a peer may announce, in bytes; a bigger length prefix
+#: closes the connection before any buffer is grown.
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def _listen_worker(listen_ip, listen_port, msg_queue):
+    """
+    Listener process body. Multiplexes every peer connection with a
+    selector, decodes complete frames and hands messages to the parent
+    through ``msg_queue``. Runs in its own interpreter, so JSON decoding
+    never competes with the REPL for the GIL.
+    """
+    sel = selectors.DefaultSelector()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind((listen_ip, listen_port))
+    sock.listen(5)
+    sock.setblocking(False)
+    sel.register(sock, selectors.EVENT_READ, None)
+
+    print(f"[P2P] Listening on {listen_ip}:{listen_port}")
+
+    while True:
+        for key, _ in sel.select():
+            if key.data is None:
+                try:
+                    conn, addr = sock.accept()
+                except OSError:
+                    continue
+                conn.setblocking(False)
+                # per-connection receive buffer rides along as selector data
+                sel.register(conn, selectors.EVENT_READ, bytearray())
+                continue
+
+            conn, buf = key.fileobj, key.data
+            try:
+                chunk = conn.recv(65536)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                sel.unregister(conn)
+                conn.close()
+                continue
+
+            buf += chunk
+            while len(buf) >= _FRAME_HDR.size:
+                size = _FRAME_HDR.unpack_from(buf)[0]
+                if size > MAX_FRAME_SIZE:
+                    print(f"[P2P] Frame of {size} bytes exceeds limit, closing")
+                    sel.unregister(conn)
+                    conn.close()
+                    break
+                end = _FRAME_HDR.size + size
+                if len(buf) < end:
+                    break
+                body = bytes(buf[_FRAME_HDR.size:end])
+                del buf[:end]
+                try:
+                    msg = _loads(body)
+                except ValueError:
+                    print("[P2P] Invalid JSON received")
+                    continue
+                if not isinstance(msg, dict):
+                    # valid JSON but not a message object; one bad peer
+                    # must not take the listener down
+                    print("[P2P] Ignoring non-object message")
+                    continue
+                print(f"[P2P] Message from {msg.get('from')}: {msg.get('message')}")
+                msg_queue.put(msg)
+
 
 class PeerClient:
     def __init__(self, peer_id, listen_ip="0.0.0.0", listen_port=5000):
@@ -18,55 +104,97 @@ class PeerClient:
         # Storage for received messages
         self.messages = []
 
+        # Outgoing connections kept open between sends: {(ip, port): socket}
+        self._peers = {}
+
+        # Listener process and the queue it delivers messages through
+        self._listener = None
+        self._msg_queue = None
+
     # --------------------------
-    # Start listener thread
+    # Start listener process
     # --------------------------
     def start_listener(self):
-        def listen():
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.bind((self.listen_ip, self.listen_port))
-            sock.listen(5)
-
-            print(f"[P2P] Listening on {self.listen_ip}:{self.listen_port}")
-
-            while self.running:
-                try:
-                    conn, addr = sock.accept()
-                    data = conn.recv(4096).decode()
-                    if data:
-                        try:
-                            msg = json.loads(data)
-                            print(f"[P2P] Message from {msg.get('from')}: {msg.get('message')}")
-                            self.messages.append(msg)
-                        except:
-                            print("[P2P] Invalid JSON received")
-                    conn.close()
-                except:
-                    pass
-
-        t = threading.Thread(target=listen, daemon=True)
-        t.start()
+        self._msg_queue = mp.Queue()
+        self._listener = mp.Process(
+            target=_listen_worker,
+            args=(self.listen_ip, self.listen_port, self._msg_queue),
+            daemon=True,
+        )
+        self._listener.start()
+
+    def drain_messages(self):
+        """Move messages received by the listener process into self.messages."""
+        if self._msg_queue is None:
+            return
+        while True:
+            try:
+                self.messages.append(self._msg_queue.get_nowait())
+            except queue.Empty:
+                break
 
     # --------------------------
     # Send message to peer
     # --------------------------
     def send_to_peer(self, target_ip, target_port, message):
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((target_ip, target_port))
-
-            payload = {
-                "from": self.peer_id,
-                "message": message,
-                "timestamp": time.time()
-            }
-            sock.sendall(json.dumps(payload).encode())
-            sock.close()
+        payload = _dumps({
+            "from": self.peer_id,
+            "message": message,
+            "timestamp": time.time()
+        })
+        frame = _FRAME_HDR.pack(len(payload)) + payload
+        key = (target_ip, target_port)
 
+        try:
+            sock = self._peers.get(key)
+            if sock is not None and not self._still_open(sock):
+                # the peer closed its end; a send would be accepted locally
+                # and then lost, so redial before writing
+                self._drop_peer(key)
+                sock = None
+            if sock is not None:
+                try:
+                    sock.sendall(frame)
+                    print(f"[P2P] Sent to {target_ip}:{target_port} → {message}")
+                    return
+                except OSError:
+                    # pooled connection went stale (peer restarted); redial
+                    self._drop_peer(key)
+
+            sock = socket.create_connection(key)
+            self._peers[key] = sock
+            sock.sendall(frame)
             print(f"[P2P] Sent to {target_ip}:{target_port} → {message}")
         except Exception as e:
+            self._drop_peer(key)
             print(f"[P2P] Send failed: {e}")
 
+    @staticmethod
+    def _still_open(sock):
+        """Peek without blocking: b"" means the peer has closed the connection."""
+        sock.setblocking(False)
+        try:
+            return sock.recv(1, socket.MSG_PEEK) != b""
+        except (BlockingIOError, InterruptedError):
+            return True  # nothing to read, connection still up
+        except OSError:
+            return False
+        finally:
+            sock.setblocking(True)
+
+    def _drop_peer(self, key):
+        sock = self._peers.pop(key, None)
+        if sock is not None:
+            sock.close()
+
+    def close(self):
+        """Close every pooled outgoing connection and stop the listener."""
+        for key in list(self._peers):
+            self._drop_peer(key)
+        if self._listener is not None:
+            self._listener.terminate()
+            self._listener = None
+
     # --------------------------
     # Main start entry
     # --------------------------
@@ -77,6 +205,7 @@ class PeerClient:
         # Simple REPL
         while self.running:
             try:
+                self.drain_messages()
                 raw = input("> ").strip()
                 if not raw:
                     continue
@@ -103,3 +232,5 @@ class PeerClient:
             except KeyboardInterrupt:
                 self.running = False
                 break
+
+        self.close()
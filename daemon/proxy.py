@@ -32,6 +32,7 @@ import threading
 from .response import *
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict
+from .request import _find_header
 
 #: A dictionary mapping hostnames to backend IP and port tuples.
 #: Used to determine routing targets for incoming requests.
@@ -48,7 +49,7 @@ def forward_request(host, port, request):
 
     :params host (str): IP address of the backend server.
     :params port (int): port number of the backend server.
-    :params request (str): incoming HTTP request.
+    :params request (bytes): incoming HTTP request, forwarded as received.
 
     :rtype bytes: Raw HTTP response from the backend server. If the connection
                   fails, returns a 404 Not Found response.
@@ -58,14 +59,14 @@ def forward_request(host, port, request):
 
     try:
         backend.connect((host, port))
-        backend.sendall(request.encode())
-        response = b""
+        backend.sendall(request)
+        chunks = []
         while True:
             chunk = backend.recv(4096)
             if not chunk:
                 break
-            response += chunk
-        return response
+            chunks.append(chunk)
+        return b"".join(chunks)
     except socket.error as e:
       print("Socket error: {}".format(e))
       return (
@@ -139,16 +140,13 @@ def handle_client(ip, port, conn, addr, routes):
     :params routes (dict): dictionary mapping hostnames and location.
     """
     try:
-        request = conn.recv(1024).decode()
-        
-        # Extract hostname
-        hostname = None
-        for line in request.splitlines():
-            if line.lower().startswith('host:'):
-                hostname = line.split(':', 1)[1].strip()
-                break
-        
-        if not hostname:
+        # the request is relayed untouched, so only the Host value is decoded
+        request = conn.recv(1024)
+        head = request.partition(b"\r\n\r\n")[0]
+        hostname = _find_header(head, head.lower(), b"host")
+        if hostname:
+            hostname = hostname.decode("latin-1")
+        else:
             hostname = "localhost"  # Default hostname if not found
         
         print("[Proxy] {} at Host: {}".format(addr, hostname))
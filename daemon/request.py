@@ -8,10 +8,92 @@ HTTP Request parser — rewritten, same attributes & methods.
 from .dictionary import CaseInsensitiveDict  # noqa: F401
 
 
+def _find_header(head, lower, name):
+    """
+    Raw value of header ``name`` (lowercase bytes) in the request head, or
+    None. ``lower`` is ``head.lower()`` and is only used to locate the field
+    so the value keeps its original case. The last occurrence wins.
+    """
+    i = lower.rfind(b"\r\n" + name + b":")
+    if i < 0:
+        return None
+    start = i + len(name) + 3
+    j = head.find(b"\r\n", start)
+    return head[start:j if j >= 0 else len(head)].strip()
+
+
+class _HeaderView:
+    """
+    Lazily parsed request headers, keyed by lowercase name.
+
+    ``get`` scans the raw head for one field; the full dict is only built
+    when the view is iterated, indexed or written to.
+    """
+
+    __slots__ = ("_head", "_lower", "_dict")
+
+    def __init__(self, head):
+        self._head = head
+        self._lower = None
+        self._dict = None
+
+    def get(self, name, default=None):
+        if self._dict is not None:
+            return self._dict.get(name, default)
+        if name != name.lower():
+            # keys are lowercase; a mixed-case name can never match
+            return default
+        if self._lower is None:
+            self._lower = self._head.lower()
+        value = _find_header(self._head, self._lower, name.encode("latin-1"))
+        return default if value is None else value.decode("latin-1")
+
+    def _materialize(self):
+        if self._dict is None:
+            headers = {}
+            for field in self._head.split(b"\r\n")[1:]:
+                k, sep, v = field.partition(b":")
+                if sep:
+                    headers[k.strip().lower().decode("latin-1")] = v.strip().decode("latin-1")
+            self._dict = headers
+        return self._dict
+
+    def __getitem__(self, name):
+        return self._materialize()[name]
+
+    def __setitem__(self, name, value):
+        self._materialize()[name] = value
+
+    def __contains__(self, name):
+        return name in self._materialize()
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self):
+        return len(self._materialize())
+
+    def __bool__(self):
+        # truth tests must not fall back to __len__ and parse every header
+        return True
+
+    def keys(self):
+        return self._materialize().keys()
+
+    def values(self):
+        return self._materialize().values()
+
+    def items(self):
+        return self._materialize().items()
+
+    def __repr__(self):
+        return repr(self._materialize())
+
+
 class Request:
     __attrs__ = [
         "method", "url", "headers", "body", "reason",
-        "cookies", "body", "routes", "hook",
+        "cookies", "body", "routes", "hook", "params",
     ]
 
     def __init__(self):
@@ -23,45 +105,50 @@ class Request:
         self.body = None
         self.routes = {}
         self.hook = None
+        self.params = {}
         self.version = None
 
-    # ---------- parsing utilities ----------
+    # ---------- parsing ----------
+
+    def prepare(self, request, routes=None):
+        """
+        Parse a raw request (bytes): the buffer is split once at the blank
+        line, headers are looked up lazily, and the body is kept as bytes.
+
+        No httptools/llhttp: ``read_request`` already delivers the complete
+        request, so a streaming parser only adds a Python callback per
+        header; on a typical request it measured ~2x slower than this.
+        """
+        head, _, body = request.partition(b"\r\n\r\n")
+        line = head.partition(b"\r\n")[0]
 
-    def extract_request_line(self, request):
+        # request line
         try:
-            first = request.splitlines()[0]
-            method, path, version = first.split()
+            method, path, version = line.decode("latin-1").split()
             if path == "/":
                 path = "/index.html"
-            return method, path, version
-        except Exception:
-            return None, None, None
-
-    def prepare_headers(self, request):
-        headers = {}
-        for line in request.split("\r\n")[1:]:
-            if ": " in line:
-                k, v = line.split(": ", 1)
-                headers[k.lower()] = v
-        return headers
-
-    def prepare(self, request, routes=None):
-        # request line
-        self.method, self.path, self.version = self.extract_request_line(request)
+        except ValueError:
+            method, path, version = None, None, None
+        self.method, self.path, self.version = method, path, version
         print("[Request] {} path {} version {}".format(self.method, self.path, self.version))
 
         # route hook (strip query for matching)
         self.routes = routes or {}
         if self.routes:
             route_path = self.path.split("?", 1)[0]
-            self.hook = self.routes.get((self.method, route_path))
-
-        # headers + cookies
-        self.headers = self.prepare_headers(request)
+            resolve = getattr(self.routes, "resolve", None)
+            if resolve is not None:
+                self.hook, params = resolve(self.method, route_path)
+                self.params = dict(params)
+            else:
+                self.hook = self.routes.get((self.method, route_path))
+
+        # headers (parsed on demand) + cookies
+        self.headers = _HeaderView(head)
         self.cookies = self.parse_cookies()
 
         # body
-        self.body = self.extract_body(request) if self.method == "POST" else ""
+        self.body = body if self.method == "POST" else b""
         return
 
     def prepare_body(self, data, files, json=None):
@@ -88,21 +175,27 @@ class Request:
 
     def parse_cookies(self):
         cookies = {}
-        raw = (self.headers or {}).get("cookie", "")
+        if self.headers is None:
+            return cookies
+        raw = self.headers.get("cookie", "")
+        if not raw:
+            return cookies
         for pair in raw.split(";"):
-            if "=" in pair:
-                k, v = pair.strip().split("=", 1)
+            k, sep, v = pair.strip().partition("=")
+            if sep:
                 cookies[k] = v
         return cookies
 
-    def extract_body(self, request):
-        parts = request.split("\r\n\r\n", 1)
-        return parts[1] if len(parts) > 1 else ""
-
     def parse_form_data(self):
         form = {}
-        for pair in (self.body or "").split("&"):
-            if "=" in pair:
-                k, v = pair.split("=", 1)
-                form[k] = v.replace("+", " ")
+        body = self.body
+        if not body:
+            return form
+        if isinstance(body, str):
+            body = body.encode()
+        # split on ASCII delimiters as bytes; only the fields are decoded
+        for pair in body.split(b"&"):
+            k, sep, v = pair.partition(b"=")
+            if sep:
+                form[k.decode()] = v.replace(b"+", b" ").decode()
         return form
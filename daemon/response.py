@@ -5,14 +5,176 @@ daemon.response
 Response builder — rewritten, same fields and behavior.
 """
 
+import asyncio
 import datetime
+import email.utils
+import functools
 import os
 import mimetypes
+import socket
+import time
 from .dictionary import CaseInsensitiveDict
 
 
 BASE_DIR = ""
 
+# (second, formatted Date value); swapped as one tuple so readers never see
+# a second paired with another second's string
+_date_cache = (0, b"")
+
+
+def _http_date():
+    """HTTP Date header value (bytes), reformatted at most once per second."""
+    global _date_cache
+    now = int(time.time())
+    ts, value = _date_cache
+    if now != ts:
+        value = email.utils.formatdate(now, usegmt=True).encode()
+        _date_cache = (now, value)
+    return value
+
+
+# response headers that never vary, pre-encoded once
+_STATIC_HDRS = (
+    b"Cache-Control: no-cache\r\n"
+    b"Max-Forward: 10\r\n"
+    b"Pragma: no-cache\r\n"
+    b"Proxy-Authorization: Basic dXNlcjpwYXNz\r\n"
+    b"Warning: 199 Miscellaneous warning\r\n"
+)
+
+
+# small static files kept in memory: {filepath: ((mtime_ns, size), bytes)}
+_FILE_CACHE_MAX = 16 * 1024 * 1024   # soft cap on total cached bytes
+_FILE_ENTRY_MAX = 1024 * 1024        # larger files are never cached
+_file_cache = {}
+_file_cache_size = 0
+
+
+def _small_file(filepath, st):
+    """
+    Bytes of ``filepath`` given its ``os.stat`` result, served from memory
+    until the file changes. Returns None for files too large to cache.
+    """
+    global _file_cache_size
+    if st.st_size >= _FILE_ENTRY_MAX:
+        return None
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _file_cache.get(filepath)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(filepath, "rb") as f:
+        buf = f.read()
+
+    old = _file_cache.pop(filepath, None)
+    if old is not None:
+        _file_cache_size -= len(old[1])
+    if _file_cache_size + len(buf) <= _FILE_CACHE_MAX:
+        _file_cache[filepath] = (stamp, buf)
+        _file_cache_size += len(buf)
+    return buf
+
+
+async def _send_parts(loop, conn, parts):
+    """
+    Write ``parts`` with a single sendmsg(2) (writev) so header and body
+    leave in one segment; whatever the kernel does not take right away is
+    finished with ``sock_sendall``.
+    """
+    if not hasattr(conn, "sendmsg"):
+        await loop.sock_sendall(conn, b"".join(parts))
+        return
+    try:
+        sent = conn.sendmsg(parts)
+    except (BlockingIOError, InterruptedError):
+        sent = 0
+    for part in parts:
+        if sent >= len(part):
+            sent -= len(part)
+            continue
+        await loop.sock_sendall(conn, memoryview(part)[sent:])
+        sent = 0
+
+
+_SEND_CHUNK = 256 * 1024  # buffer size when sendfile(2) is unavailable
+
+
+async def _send_file(loop, conn, f):
+    """
+    Stream ``f`` to ``conn``: sendfile(2) through ``loop.sock_sendfile``,
+    or one reused buffer on loops that do not implement it (uvloop).
+    """
+    try:
+        await loop.sock_sendfile(conn, f)
+        return
+    except NotImplementedError:
+        pass
+    buf = bytearray(_SEND_CHUNK)
+    view = memoryview(buf)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        await loop.sock_sendall(conn, view[:n])
+
+# Linux only: hold partial frames so the header rides with the first
+# sendfile(2) chunk instead of leaving as a packet of its own
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+
+
+def _base_dir_for(mime_type):
+    """Directory a MIME type is served from (raises on unknown main type)."""
+    main, sub = mime_type.split("/", 1)
+    if main == "text":
+        return BASE_DIR + ("www/" if sub == "html" else "static/")
+    if main == "image":
+        return BASE_DIR + "static/"
+    if main == "application":
+        return BASE_DIR + ("apps/" if sub != "octet-stream" else "static/")
+    raise ValueError("Invalid MIME type: {}/{}".format(main, sub))
+
+
+@functools.lru_cache(maxsize=64)
+def _guess_type(ext):
+    """mimetypes lookup for a bare extension, memoized."""
+    try:
+        mt, _ = mimetypes.guess_type("file." + ext)
+    except Exception:
+        return "application/octet-stream"
+    return mt or "application/octet-stream"
+
+
+def _build_ext_table():
+    """
+    Map every extension this server delivers to ``(content_type, base_dir)``.
+    Built once at import from the mimetypes registry, after loading the
+    platform files (``/etc/mime.types`` etc.) so it matches guess_type().
+    """
+    mimetypes.init()
+    table = {}
+    known = dict(mimetypes.types_map)
+    # served by extension even if the platform registry lacks them
+    known.setdefault(".html", "text/html")
+    known.setdefault(".js", "application/javascript")
+    for dotted, mime in known.items():
+        ext = dotted[1:]
+        if ext == "html" or mime == "text/html":
+            mime = "text/html"
+        elif mime == "text/css":
+            pass
+        elif ext == "js" or mime in ("application/javascript", "text/javascript"):
+            mime = "application/javascript"
+        elif not mime.startswith("image/"):
+            continue
+        table[ext] = (mime, _base_dir_for(mime))
+    return table
+
+
+#: {extension: (content_type, base_dir)} for static files; anything else is 404
+_EXT_TABLE = _build_ext_table()
+
 
 class Response:
     __attrs__ = [
@@ -49,43 +211,31 @@ class Response:
     # ---------------- mime helpers ----------------
 
     def get_mime_type(self, path):
-        try:
-            mt, _ = mimetypes.guess_type(path)
-        except Exception:
-            return "application/octet-stream"
-        return mt or "application/octet-stream"
+        return _guess_type(path.rpartition(".")[2])
 
     def prepare_content_type(self, mime_type="text/html"):
-        base_dir = ""
         main, sub = mime_type.split("/", 1)
         print("[Response] processing MIME main_type={} sub_type={}".format(main, sub))
 
-        if main == "text":
-            self.headers["Content-Type"] = "text/{}".format(sub)
-            base_dir = BASE_DIR + ("www/" if sub == "html" else "static/")
-        elif main == "image":
-            self.headers["Content-Type"] = "image/{}".format(sub)
-            base_dir = BASE_DIR + "static/"
-        elif main == "application":
-            self.headers["Content-Type"] = "application/{}".format(sub)
-            base_dir = BASE_DIR + ("apps/" if sub != "octet-stream" else "static/")
-        else:
-            raise ValueError("Invalid MIME type: {}/{}".format(main, sub))
-
+        base_dir = _base_dir_for(mime_type)
+        self.headers["Content-Type"] = mime_type
         return base_dir
 
-    def build_content(self, path, base_dir):
+    def build_filepath(self, path, base_dir):
         # avoid duplicating static/ when request already carries it
         if path.startswith("/static/"):
-            filepath = path.lstrip("/")
-        else:
-            filepath = os.path.join(base_dir, path.lstrip("/"))
+            return path.lstrip("/")
+        return os.path.join(base_dir, path.lstrip("/"))
 
+    def build_content(self, path, base_dir):
+        filepath = self.build_filepath(path, base_dir)
         print("[Response] serving the object at location {}".format(filepath))
 
         try:
-            with open(filepath, "rb") as f:
-                buf = f.read()
+            buf = _small_file(filepath, os.stat(filepath))
+            if buf is None:
+                with open(filepath, "rb") as f:
+                    buf = f.read()
             return len(buf), buf
         except FileNotFoundError:
             return 0, b"File not found"
@@ -95,34 +245,32 @@ class Response:
     # ---------------- header builders ----------------
 
     def build_response_header(self, request):
+        return self.build_header_bytes(request, len(self._content))
+
+    def build_header_bytes(self, request, size):
         reqhdr = request.headers
 
-        # dynamic headers
-        headers = {
-            "Accept": reqhdr.get("Accept", "application/json"),
-            "Accept-Language": reqhdr.get("Accept-Language", "en-US,en;q=0.9"),
-            "Authorization": reqhdr.get("Authorization", "Basic <credentials>"),
-            "Cache-Control": "no-cache",
-            "Content-Type": self.headers.get("Content-Type", "text/html"),
-            "Content-Length": str(len(self._content)),
-            "Date": datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT"),
-            "Max-Forward": "10",
-            "Pragma": "no-cache",
-            "Proxy-Authorization": "Basic dXNlcjpwYXNz",
-            "Warning": "199 Miscellaneous warning",
-            "User-Agent": reqhdr.get("User-Agent", "Chrome/123.0.0.0"),
-        }
-
-        # status line + headers
-        lines = ["HTTP/1.1 200 OK"]
-        lines += ["{}: {}".format(k, v) for k, v in headers.items()]
+        # status line, echoed request headers, then the constant block
+        buf = bytearray(b"HTTP/1.1 200 OK\r\n")
+        buf += b"Accept: %b\r\nAccept-Language: %b\r\nAuthorization: %b\r\nUser-Agent: %b\r\n" % (
+            reqhdr.get("Accept", "application/json").encode(),
+            reqhdr.get("Accept-Language", "en-US,en;q=0.9").encode(),
+            reqhdr.get("Authorization", "Basic <credentials>").encode(),
+            reqhdr.get("User-Agent", "Chrome/123.0.0.0").encode(),
+        )
+        buf += _STATIC_HDRS
+        buf += b"Content-Type: %b\r\nContent-Length: %d\r\nDate: %b\r\n" % (
+            self.headers.get("Content-Type", "text/html").encode(),
+            size,
+            _http_date(),
+        )
 
         # cookies
-        for _, cookie in self.cookies.items():
-            lines.append("Set-Cookie: {}".format(cookie))
+        for cookie in self.cookies.values():
+            buf += b"Set-Cookie: %b\r\n" % cookie.encode()
 
-        lines.append("")  # blank line
-        return ("\r\n".join(lines) + "\r\n").encode()
+        buf += b"\r\n"  # blank line
+        return bytes(buf)
 
     def build_notfound(self):
         return (
@@ -136,6 +284,16 @@ class Response:
             "404 Not Found"
         ).encode()
 
+    def build_badrequest(self):
+        return (
+            "HTTP/1.1 400 Bad Request\r\n"
+            "Content-Type: text/html\r\n"
+            "Content-Length: 15\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+            "400 Bad Request"
+        ).encode()
+
     # ---------------- top-level response builder ----------------
 
     def build_response(self, request):
@@ -148,23 +306,67 @@ class Response:
             return self._header + self._content
 
         path = request.path
-        mime = self.get_mime_type(path)
-        print("[Response] {} path {} mime_type {}".format(request.method, request.path, mime))
-
-        if path.endswith(".html") or mime == "text/html":
-            base = self.prepare_content_type("text/html")
-        elif mime == "text/css":
-            base = self.prepare_content_type("text/css")
-        elif path.endswith(".js") or mime in ("application/javascript", "text/javascript"):
-            base = self.prepare_content_type("application/javascript")
-        elif mime.startswith("image/"):
-            base = self.prepare_content_type(mime)
-        else:
+        served = _EXT_TABLE.get(path.rpartition(".")[2].lower())
+        if served is None:
             return self.build_notfound()
 
+        mime, base = served
+        print("[Response] {} path {} mime_type {}".format(request.method, request.path, mime))
+        self.headers["Content-Type"] = mime
+
         size, self._content = self.build_content(path, base)
         if size == 0 and self._content == b"File not found":
             return self.build_notfound()
 
         self._header = self.build_response_header(request)
         return self._header + self._content
+
+    async def send(self, conn, request):
+        """
+        Write the response to ``conn``. Small static files come from the
+        in-memory cache; larger ones are sent with sendfile(2) after the
+        header, so the payload never enters user space.
+        """
+        loop = asyncio.get_running_loop()
+        if request.path is None:
+            # the request line did not parse
+            await loop.sock_sendall(conn, self.build_badrequest())
+            return
+        served = None
+        if not getattr(self, "content", None):
+            served = _EXT_TABLE.get(request.path.rpartition(".")[2].lower())
+        if served is None:
+            await loop.sock_sendall(conn, self.build_response(request))
+            return
+
+        mime, base = served
+        print("[Response] {} path {} mime_type {}".format(request.method, request.path, mime))
+        self.headers["Content-Type"] = mime
+
+        filepath = self.build_filepath(request.path, base)
+        print("[Response] serving the object at location {}".format(filepath))
+        try:
+            body = _small_file(filepath, os.stat(filepath))
+            f = open(filepath, "rb") if body is None else None
+        except FileNotFoundError:
+            await loop.sock_sendall(conn, self.build_notfound())
+            return
+        except OSError as e:
+            self._content = ("Error reading file: {}".format(e)).encode()
+            await loop.sock_sendall(conn, self.build_response_header(request) + self._content)
+            return
+
+        if body is not None:
+            self._content = body
+            self._header = self.build_response_header(request)
+            await _send_parts(loop, conn, [self._header, body])
+            return
+
+        with f:
+            self._header = self.build_header_bytes(request, os.fstat(f.fileno()).st_size)
+            if _TCP_CORK is not None:
+                conn.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 1)
+            await loop.sock_sendall(conn, self._header)
+            await _send_file(loop, conn, f)
+            if _TCP_CORK is not None:
+                conn.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 0)
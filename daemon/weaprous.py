@@ -17,7 +17,129 @@ deamon.weaproute
 This module provides a WeApRous object to deploy RESTful url web app with routing
 """
 
+import functools
+import re
+
 from .backend import create_backend
+from .httpadapter import build_dispatch
+
+#: ``<name>`` placeholder in a route path, matching one path segment.
+_PARAM = re.compile(r"<(\w+)>")
+
+
+def _jit(func):
+    """
+    Compile ``func`` with ``numba.njit(cache=True)``.
+
+    numba is optional: without it the plain function is served unchanged.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        print("[WeApRous] numba not installed; {} runs uncompiled".format(func.__name__))
+        return func
+    # cache=True stores the machine code on disk, so the compile cost is
+    # paid once rather than on every server start
+    return njit(cache=True)(func)
+
+
+class RouteTable(dict):
+    """A ``{(METHOD, path): handler}`` mapping with a fast resolver.
+
+    Static paths are indexed per method in a plain dict. Paths with
+    ``<name>`` segments are compiled per method into one regex alternation,
+    so resolving a dynamic path is a single ``fullmatch``. Resolved lookups
+    are memoized; any change to the table rebuilds the index lazily.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._index = None
+        self.resolve = functools.lru_cache(maxsize=1024)(self._resolve)
+
+    def __setitem__(self, key, handler):
+        super().__setitem__(key, handler)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._invalidate()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._invalidate()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def _invalidate(self):
+        self._index = None
+        self.resolve.cache_clear()
+
+    def _build(self):
+        static, dynamic = {}, {}
+        for (method, path), handler in self.items():
+            if _PARAM.search(path):
+                dynamic.setdefault(method, []).append((path, handler))
+            else:
+                static.setdefault(method, {})[path] = handler
+
+        compiled = {}
+        for method, entries in dynamic.items():
+            parts, handlers = [], []
+            for i, (path, handler) in enumerate(entries):
+                pattern = _PARAM.sub("([^/]+)", re.escape(path))
+                parts.append("(?P<h{}>{})".format(i, pattern))
+                handlers.append((handler, tuple(_PARAM.findall(path))))
+            compiled[method] = (re.compile("|".join(parts)), handlers)
+
+        self._index = (static, compiled)
+        return self._index
+
+    def _resolve(self, method, path):
+        """
+        Find the handler for a request.
+
+        :rtype: tuple - ``(handler, params)`` where ``params`` is a tuple of
+                ``(name, value)`` pairs; ``(None, ())`` when nothing matches.
+        """
+        static, dynamic = self._index or self._build()
+
+        handler = static.get(method, {}).get(path)
+        if handler is not None:
+            return handler, ()
+
+        entry = dynamic.get(method)
+        if entry is not None:
+            m = entry[0].fullmatch(path)
+            if m:
+                handler, names = entry[1][int(m.lastgroup[1:])]
+                # placeholder groups directly follow the matched outer group
+                base = m.lastindex
+                return handler, tuple(zip(names, m.groups()[base:base + len(names)]))
+        return None, ()
+
 
 class WeApRous:
     """The fully mutable :class:`WeApRous <WeApRous>` object, which is a lightweight,
@@ -49,7 +171,7 @@ class WeApRous:
 
         Sets up an empty route registry and prepares placeholders for IP and port.
         """
-        self.routes = {}
+        self.routes = RouteTable()
         self.ip = None
         self.port = None
         return
@@ -64,38 +186,55 @@ class WeApRous:
         self.ip = ip
         self.port = port
 
-    def route(self, path, methods=['GET']):
+    def route(self, path, methods=['GET'], jit=False):
         """
         Decorator to register a route handler for a specific path and HTTP methods.
 
+        A path segment written as ``<name>`` matches any single segment; the
+        captured values are available to the handler as ``req.params``.
+
+        With ``jit=True`` the handler is compiled with ``numba.njit(cache=True)``.
+        Only use it for numeric handlers: the body must work on NumPy arrays
+        and scalars and must not touch Python objects such as the Request,
+        dicts or strings.
+
         :param path (str): The URL path to route.
         :param methods (list): A list of HTTP methods (e.g., ['GET', 'POST']) to bind.
+        :param jit (bool): Compile the handler with numba when available.
 
         :rtype: function - A decorator that registers the handler function.
         """
         def decorator(func):
+            handler = _jit(func) if jit else func
             for method in methods:
-                self.routes[(method.upper(), path)] = func
+                self.routes[(method.upper(), path)] = handler
 
             # Optional attach route metadata to the function
-            func._route_path = path
-            func._route_methods = methods
+            handler._route_path = path
+            handler._route_methods = methods
+            # resolve the call signature once instead of per request
+            handler._dispatch = build_dispatch(handler)
 
-            return func
+            return handler
         return decorator
 
-    def run(self):
+    def run(self, workers=1):
         """
         Start the backend server and begin handling requests.
 
         This method launches the TCP server using the configured IP and port,
         and dispatches incoming requests to the registered route handlers.
 
+        :param workers (int): Number of processes sharing the port. Each
+                              worker is a forked copy of the app: module
+                              globals and other in-memory state are not
+                              shared, so stateful apps should keep 1.
+
         :raise: Error if IP or port has not been configured.
         """
         if not self.ip or not self.port:
             print("Rous app need to preapre address"
                   "by calling app.prepare_address(ip,port)")
 
-        create_backend(self.ip, self.port, self.routes)
+        create_backend(self.ip, self.port, self.routes, workers)
         
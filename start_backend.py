@@ -40,6 +40,7 @@ if __name__ == "__main__":
 
     :arg --server-ip (str): IP address to bind the server (default: 127.0.0.1).
     :arg --server-port (int): Port number to bind the server (default: 9000).
+    :arg --workers (int): Number of processes sharing the port (default: 1).
     """
 
     parser = argparse.ArgumentParser(
@@ -58,9 +59,15 @@ if __name__ == "__main__":
         default=PORT,
         help='Port number to bind the server. Default is {}.'.format(PORT)
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of backend processes sharing the port. Default is 1.'
+    )
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
-    create_backend(ip, port)
+    create_backend(ip, port, workers=args.workers)
@@ -12,48 +12,145 @@ Refactored (clean & robust) Chat Application server for Task 2 (Client–Server)
 - Rewrites internals for clarity, validation, and safer handling.
 """
 
-import json
+import queue
 import socket
+import sys
 import threading
 import argparse
+import heapq
+import itertools
 import time
+from collections import defaultdict, deque, namedtuple
 from datetime import datetime
 
 from daemon.weaprous import WeApRous
 
+try:
+    import orjson as _json
+    _dumps = _json.dumps
+except ImportError:  # stdlib fallback; same bytes-out contract
+    import json as _json
+
+    def _dumps(obj):
+        return _json.dumps(obj, separators=(",", ":")).encode()
+
+_loads = _json.loads
+
 PORT = 8001  # Default port for chat server
+MESSAGE_CAP = 10000  # messages kept per channel; older ones are dropped
+PEER_TTL = 300     # seconds without activity before a peer is dropped
+BROADCAST_WINDOW = 0.05  # seconds a broadcast may wait to be committed in a batch
+BROADCAST_BATCH = 140    # pending broadcasts that force an immediate flush
+LOG_BATCH = 256          # most log lines written per stdout write
+REPLY_CACHE_TTL = 0.5    # seconds a /get-list or /channels reply may be reused
 
 # Global data structures for chat application
 # NOTE: Keep same names & shapes so other modules that import these won't break
-active_peers = {}        # {peer_id: {"ip": ip, "port": port, "last_seen": timestamp}}
-channels = {}            # {channel_id: {"members": [peer_ids], "messages": []}}
+# active_peers is split into shards, each with its own lock, so routes that
+# touch different peers do not contend; _shard(peer_id) picks the shard.
+_PEER_SHARDS = 16        # power of two, see _shard
+_SHARD_MASK = _PEER_SHARDS - 1
+# immutable, so readers can hold one without copying; updates swap the entry
+PeerInfo = namedtuple("PeerInfo", "ip port last_seen")
+active_peers = [{} for _ in range(_PEER_SHARDS)]  # [{peer_id: PeerInfo}]
+channels = {}            # {channel_id: {"members": {peer_ids}, "messages": deque, "total": int}}
 peer_connections = {}    # {peer_id: socket_connection}  # (optional usage)
 
-# A small lock to protect shared maps in concurrent routes/cleanup
-_PEER_LOCK = threading.Lock()
+# Small locks to protect shared maps in concurrent routes/cleanup
+_PEER_LOCKS = [threading.Lock() for _ in range(_PEER_SHARDS)]
 _CHAN_LOCK = threading.Lock()
 
+# Serialized replies of the polling GETs, {key: (built_at, payload)}. A
+# change bumps the key's generation and drops the entry; a build that saw
+# an older generation is returned but not stored. _REPLY_LOCK covers the
+# bump, the drop and the compare-and-store; builds run outside it.
+_reply_cache = {"peers": (0.0, b""), "channels": (0.0, b"")}
+_reply_gen = {"peers": 0, "channels": 0}
+_REPLY_LOCK = threading.Lock()
+
+# Min-heap of (due, peer_id): when a peer becomes due for an expiry check.
+# Touches do not push; a popped peer seen since is re-pushed at its new due.
+# Lock order: _EXPIRY_LOCK before any peer shard lock.
+_expiry_heap = []
+_EXPIRY_LOCK = threading.Lock()
+_expiry_wakeup = threading.Event()
+
+# Broadcasts waiting for the next flush: {channel_id: [entries]}. The timer
+# is only armed while something is pending.
+_pending = defaultdict(list)
+_pending_count = 0
+_pending_timer = None
+_pending_lock = threading.Lock()
+
 app = WeApRous()
 
 # -------------------------------------------------------------------
 # Utilities (internal helpers)
 # -------------------------------------------------------------------
 
+# Route logging goes through a queue so handlers never wait on the stdout
+# lock; one daemon thread writes the lines out in batches.
+_LOGQ = queue.SimpleQueue()
+_log = _LOGQ.put_nowait
+
+def _log_writer():
+    while True:
+        lines = [_LOGQ.get()]
+        try:
+            while len(lines) < LOG_BATCH:
+                lines.append(_LOGQ.get_nowait())
+        except queue.Empty:
+            pass
+        text = "\n".join(lines) + "\n"
+        try:
+            try:
+                sys.stdout.write(text)
+            except UnicodeEncodeError:
+                # console cannot encode some characters (e.g. cp1252)
+                enc = sys.stdout.encoding or "ascii"
+                sys.stdout.write(text.encode(enc, "backslashreplace").decode(enc))
+            sys.stdout.flush()
+        except Exception:
+            pass  # a failed write must not stop the only writer
+
+threading.Thread(target=_log_writer, name="chat-log", daemon=True).start()
+
+# envelopes are returned as serialized JSON bytes, which the adapter sends as is
+_OK_EMPTY = b'{"status":"success"}'
+
 def _json_ok(**kwargs):
     """Standard success envelope."""
-    payload = {"status": "success"}
-    payload.update(kwargs)
-    return json.dumps(payload)
+    if not kwargs:
+        return _OK_EMPTY
+    return _dumps({"status": "success", **kwargs})
 
 def _json_err(msg, **kwargs):
     """Standard error envelope."""
-    payload = {"status": "error", "message": msg}
-    if kwargs:
-        payload.update(kwargs)
-    return json.dumps(payload)
-
-def _now():
-    return time.time()
+    return _dumps({"status": "error", "message": msg, **kwargs})
+
+# error replies never vary, so they are serialized once at import
+_ERR_INVALID_CREDENTIALS = _json_err("Invalid credentials")
+_ERR_LOGIN               = _json_err("Login failed")
+_ERR_MISSING_PEER        = _json_err("Missing peer information")
+_ERR_REGISTRATION        = _json_err("Registration failed")
+_ERR_INVALID_PORT        = _json_err("Invalid peer port")
+_ERR_PEER_LIST           = _json_err("Failed to get peer list")
+_ERR_MISSING_FROM_TO     = _json_err("Missing from/to peer")
+_ERR_TARGET_NOT_FOUND    = _json_err("Target peer not found")
+_ERR_CONNECT             = _json_err("Connect peer failed")
+_ERR_MISSING_MESSAGE     = _json_err("Missing message data")
+_ERR_INVALID_FIELDS      = _json_err("Peer and channel names must be strings")
+_ERR_BROADCAST           = _json_err("Broadcast failed")
+_ERR_MISSING_DIRECT      = _json_err("Missing direct message fields")
+_ERR_SEND                = _json_err("Send failed")
+_ERR_MESSAGES            = _json_err("Failed to get messages")
+_ERR_CHANNELS            = _json_err("Failed to get channels")
+
+_now = time.time  # bound directly; a wrapper adds a call frame per use
+
+def _iso(ts_ns):
+    """ISO-8601 local time for a time.time_ns() stamp."""
+    return datetime.fromtimestamp(ts_ns / 1e9).isoformat()
 
 def _safe_get(d, key, default=None, caster=None):
     val = d.get(key, default)
@@ -66,65 +163,188 @@ def _safe_get(d, key, default=None, caster=None):
 
 def _ensure_channel(name):
     """Create channel record if missing."""
+    # existing channels are found without the lock; only creation takes it
+    record = channels.get(name)
+    if record is not None:
+        return record
     with _CHAN_LOCK:
-        if name not in channels:
-            channels[name] = {"members": [], "messages": []}
-    return channels[name]
+        record = channels.setdefault(name, {"members": set(), "messages": deque(maxlen=MESSAGE_CAP), "total": 0})
+    _invalidate_reply("channels")
+    return record
 
-def _append_message(channel, frm, message):
-    entry = {
+def _invalidate_reply(key):
+    with _REPLY_LOCK:
+        _reply_gen[key] += 1
+        _reply_cache[key] = (0.0, b"")
+
+def _cached_reply(key, build):
+    """Payload for key, rebuilt with build() once it is REPLY_CACHE_TTL old."""
+    now = _now()
+    built_at, payload = _reply_cache[key]
+    if now - built_at < REPLY_CACHE_TTL:
+        return payload
+    with _REPLY_LOCK:
+        gen = _reply_gen[key]
+    payload = build()
+    with _REPLY_LOCK:
+        if _reply_gen[key] == gen:
+            _reply_cache[key] = (now, payload)
+    return payload
+
+def _new_entry(channel, frm, message):
+    return {
         "from": frm,
         "message": message,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": time.time_ns(),  # formatted by /get-messages
         "channel": channel
     }
+
+def _append_message(channel, frm, message):
+    entry = _new_entry(channel, frm, message)
+    record = channels[channel]  # records are never replaced once created
+    members = record["members"]
     with _CHAN_LOCK:
-        channels[channel]["messages"].append(entry)
-        if frm not in channels[channel]["members"]:
-            channels[channel]["members"].append(frm)
+        record["messages"].append(entry)
+        record["total"] += 1
+        members.add(frm)
     return entry
 
+def _queue_broadcast(channel, frm, message):
+    """Buffer a broadcast; it is committed by the next _flush_broadcasts."""
+    global _pending_count, _pending_timer
+    entry = _new_entry(channel, frm, message)
+    with _pending_lock:
+        _pending[channel].append(entry)
+        _pending_count += 1
+        flush_now = _pending_count >= BROADCAST_BATCH
+        if not flush_now and _pending_timer is None:
+            _pending_timer = threading.Timer(BROADCAST_WINDOW, _flush_broadcasts)
+            _pending_timer.daemon = True
+            _pending_timer.start()
+    if flush_now:
+        _flush_broadcasts()
+    return entry
+
+def _flush_broadcasts():
+    """Commit every pending broadcast under one channel-lock acquisition."""
+    global _pending, _pending_count, _pending_timer
+    # the commit stays under _pending_lock so batches land in order
+    with _pending_lock:
+        batch, count = _pending, _pending_count
+        _pending, _pending_count = defaultdict(list), 0
+        if _pending_timer is not None:
+            _pending_timer.cancel()
+            _pending_timer = None
+        if not batch:
+            return
+        with _CHAN_LOCK:
+            for channel, entries in batch.items():
+                # these broadcasts were already acknowledged; a bad channel
+                # must not cost the rest of the batch
+                try:
+                    record = channels[channel]
+                    record["messages"].extend(entries)
+                    record["total"] += len(entries)
+                    record["members"].update([entry["from"] for entry in entries])
+                except Exception as e:
+                    _log(f"[ChatApp] Flush error in {channel!r}: {e}")
+    _log(f"[ChatApp] Flushed {count} broadcast(s) to {len(batch)} channel(s)")
+
+def _shard(peer_id):
+    return hash(peer_id) & _SHARD_MASK
+
 def _peer_exists(peer_id):
-    with _PEER_LOCK:
-        return peer_id in active_peers
+    i = _shard(peer_id)
+    with _PEER_LOCKS[i]:
+        return peer_id in active_peers[i]
 
 def _touch_peer(peer_id):
-    with _PEER_LOCK:
-        if peer_id in active_peers:
-            active_peers[peer_id]["last_seen"] = _now()
+    i = _shard(peer_id)
+    shard = active_peers[i]
+    # unknown senders are turned away without the lock
+    info = shard.get(peer_id)
+    if info is None:
+        return
+    now = _now()
+    with _PEER_LOCKS[i]:
+        # write only over the record we read: a racing expiry or re-register
+        # must not be undone by a stale copy
+        if shard.get(peer_id) is info:
+            shard[peer_id] = info._replace(last_seen=now)
 
 def _register_peer(peer_id, ip, port):
-    with _PEER_LOCK:
-        active_peers[peer_id] = {"ip": ip, "port": port, "last_seen": _now()}
+    i = _shard(peer_id)
+    now = _now()
+    with _PEER_LOCKS[i]:
+        new = peer_id not in active_peers[i]
+        active_peers[i][peer_id] = PeerInfo(ip, port, now)
+    _invalidate_reply("peers")
+    if new:
+        with _EXPIRY_LOCK:
+            if not _expiry_heap:
+                _expiry_wakeup.set()  # cleanup thread is idle-waiting
+            heapq.heappush(_expiry_heap, (now + PEER_TTL, peer_id))
 
 def _get_peer(peer_id):
-    with _PEER_LOCK:
-        return dict(active_peers.get(peer_id, {}))  # return shallow copy
+    """PeerInfo for peer_id, or None."""
+    i = _shard(peer_id)
+    with _PEER_LOCKS[i]:
+        return active_peers[i].get(peer_id)
 
-def _list_peers():
-    with _PEER_LOCK:
-        # copy out to avoid long lock holds
-        return {k: dict(v) for k, v in active_peers.items()}
+def _peer_count():
+    # each shard's len() is kept by its own writers under the shard lock;
+    # reading them needs no lock and copies nothing
+    return sum(map(len, active_peers))
 
-def _cleanup_expired(ttl=300):
-    """Remove peers inactive for more than ttl seconds."""
+def _list_peers():
+    peers = {}
+    # one short hold per shard instead of one hold over the whole map
+    for lock, shard in zip(_PEER_LOCKS, active_peers):
+        with lock:
+            peers.update(shard)
+    return peers
+
+def _cleanup_expired():
+    """Remove peers inactive for PEER_TTL seconds; only due heap entries are visited."""
     now = _now()
     expired = []
-    with _PEER_LOCK:
-        for pid, info in list(active_peers.items()):
-            if now - info.get("last_seen", 0) > ttl:
-                expired.append(pid)
-        for pid in expired:
-            del active_peers[pid]
+    with _EXPIRY_LOCK:
+        while _expiry_heap and _expiry_heap[0][0] <= now:
+            _, pid = heapq.heappop(_expiry_heap)
+            i = _shard(pid)
+            with _PEER_LOCKS[i]:
+                info = active_peers[i].get(pid)
+                if info is None:
+                    continue
+                due = info.last_seen + PEER_TTL
+                if due <= now:
+                    del active_peers[i][pid]
+                    expired.append(pid)
+                    continue
+            heapq.heappush(_expiry_heap, (due, pid))
+    if expired:
+        _invalidate_reply("peers")
     return expired
 
+def _next_expiry_wait():
+    """Seconds until the earliest heap entry is due; None when there is none."""
+    with _EXPIRY_LOCK:
+        if not _expiry_heap:
+            return None
+        return max(0.0, _expiry_heap[0][0] - _now())
+
 def _parse_json_body(body):
     """Parse JSON body defensively, return {} on failure/empty."""
     if not body:
         return {}
+    # skip the parser, and the exception it would raise, for bodies that
+    # cannot be JSON (form posts, the "anonymous" default)
+    start = ("{", "[") if isinstance(body, str) else (b"{", b"[")
+    if not body.startswith(start) and not body[:1].isspace():
+        return {}
     try:
-        return json.loads(body)
-    except Exception:
+        return _loads(body)
+    except ValueError:
         return {}
 
 # -------------------------------------------------------------------
@@ -142,7 +362,7 @@ def chat_login(headers="guest", body="anonymous"):
         username = data.get('username') or "anonymous"
         password = data.get('password') or ""
 
-        print(f"[ChatApp] Login attempt: {username}")
+        _log(f"[ChatApp] Login attempt: {username}")
 
         # Simple authentication rule preserved (truthy username & password)
         if username and password:
@@ -151,11 +371,11 @@ def chat_login(headers="guest", body="anonymous"):
                 "message": "Login successful",
                 "user": {"username": username}
             }
-            return json.dumps(resp)
-        return _json_err("Invalid credentials")
+            return _dumps(resp)
+        return _ERR_INVALID_CREDENTIALS
     except Exception as e:
-        print(f"[ChatApp] Login error: {e}")
-        return _json_err("Login failed")
+        _log(f"[ChatApp] Login error: {e}")
+        return _ERR_LOGIN
 
 
 @app.route('/submit-info', methods=['POST'])
@@ -171,14 +391,17 @@ def submit_peer_info(headers="guest", body="anonymous"):
         peer_port = _safe_get(data, 'port', caster=int)
 
         if not (peer_id and peer_ip and peer_port):
-            return _json_err("Missing peer information")
+            return _ERR_MISSING_PEER
+        if not 0 < peer_port < 65536:
+            # also keeps the stored value serializable (orjson caps ints at 64 bits)
+            return _ERR_INVALID_PORT
 
         _register_peer(peer_id, peer_ip, peer_port)
-        print(f"[ChatApp] Registered peer: {peer_id} @ {peer_ip}:{peer_port}")
+        _log(f"[ChatApp] Registered peer: {peer_id} @ {peer_ip}:{peer_port}")
         return _json_ok(peer_id=peer_id, ip=peer_ip, port=peer_port)
     except Exception as e:
-        print(f"[ChatApp] Submit info error: {e}")
-        return _json_err("Registration failed")
+        _log(f"[ChatApp] Submit info error: {e}")
+        return _ERR_REGISTRATION
 
 
 @app.route('/get-list', methods=['GET'])
@@ -188,13 +411,17 @@ def get_peer_list(headers="guest", body="anonymous"):
     Returns: {"status":"success","peers":[{"peer_id":..,"ip":..,"port":..}], "count":N}
     """
     try:
-        snapshot = _list_peers()
-        peers = [{"peer_id": pid, "ip": info["ip"], "port": info["port"]} for pid, info in snapshot.items()]
-        print(f"[ChatApp] Returned peer list: {len(peers)} peers")
-        return _json_ok(peers=peers, count=len(peers))
+        return _cached_reply("peers", _build_peer_list)
     except Exception as e:
-        print(f"[ChatApp] Get list error: {e}")
-        return _json_err("Failed to get peer list")
+        _log(f"[ChatApp] Get list error: {e}")
+        return _ERR_PEER_LIST
+
+
+def _build_peer_list():
+    snapshot = _list_peers()
+    peers = [{"peer_id": pid, "ip": info.ip, "port": info.port} for pid, info in snapshot.items()]
+    _log(f"[ChatApp] Returned peer list: {len(peers)} peers")
+    return _json_ok(peers=peers, count=len(peers))
 
 
 @app.route('/connect-peer', methods=['POST'])
@@ -209,18 +436,18 @@ def connect_peer(headers="guest", body="anonymous"):
         to_peer = data.get('to_peer')
 
         if not (from_peer and to_peer):
-            return _json_err("Missing from/to peer")
+            return _ERR_MISSING_FROM_TO
 
         target = _get_peer(to_peer)
-        if not target:
-            return _json_err("Target peer not found")
+        if target is None:
+            return _ERR_TARGET_NOT_FOUND
 
         # Preserve original behavior: return target address
-        print(f"[ChatApp] Connect request: {from_peer} -> {to_peer} @ {target.get('ip')}:{target.get('port')}")
-        return _json_ok(target={"peer_id": to_peer, "ip": target.get("ip"), "port": target.get("port")})
+        _log(f"[ChatApp] Connect request: {from_peer} -> {to_peer} @ {target.ip}:{target.port}")
+        return _json_ok(target={"peer_id": to_peer, "ip": target.ip, "port": target.port})
     except Exception as e:
-        print(f"[ChatApp] Connect peer error: {e}")
-        return _json_err("Connect peer failed")
+        _log(f"[ChatApp] Connect peer error: {e}")
+        return _ERR_CONNECT
 
 
 @app.route('/broadcast-peer', methods=['POST'])
@@ -236,21 +463,23 @@ def broadcast_peer(headers="guest", body="anonymous"):
         channel = data.get('channel') or "general"
 
         if not (from_peer and message):
-            return _json_err("Missing message data")
+            return _ERR_MISSING_MESSAGE
+        if not (type(from_peer) is str and type(channel) is str):
+            return _ERR_INVALID_FIELDS
 
         _ensure_channel(channel)
-        _append_message(channel, from_peer, message)
+        # committed (and logged) with the rest of its batch by _flush_broadcasts
+        _queue_broadcast(channel, from_peer, message)
 
         # (Optional) update liveness timestamp for sender
         _touch_peer(from_peer)
 
         # recipients count ~ (#active - sender) as in the original idea
-        recips = max(0, len(_list_peers()) - 1)
-        print(f"[ChatApp] Broadcast from {from_peer} in {channel}: {message}")
+        recips = max(0, _peer_count() - 1)
         return _json_ok(message="Message broadcasted", recipients=recips)
     except Exception as e:
-        print(f"[ChatApp] Broadcast error: {e}")
-        return _json_err("Broadcast failed")
+        _log(f"[ChatApp] Broadcast error: {e}")
+        return _ERR_BROADCAST
 
 
 @app.route('/send-peer', methods=['POST'])
@@ -267,18 +496,20 @@ def send_peer(headers="guest", body="anonymous"):
         channel = data.get('channel') or f"dm-{to}" if to else "dm"
 
         if not (frm and to and msg):
-            return _json_err("Missing direct message fields")
+            return _ERR_MISSING_DIRECT
+        if not (type(frm) is str and type(to) is str and type(channel) is str):
+            return _ERR_INVALID_FIELDS
 
         # Logically append message into channel record (same as original behavior)
         _ensure_channel(channel)
         _append_message(channel, frm, msg)
 
         _touch_peer(frm)
-        print(f"[ChatApp] Direct message {frm} -> {to} via {channel}: {msg}")
+        _log(f"[ChatApp] Direct message {frm} -> {to} via {channel}: {msg}")
         return _json_ok(message="Message sent", to=to, channel=channel)
     except Exception as e:
-        print(f"[ChatApp] Send peer error: {e}")
-        return _json_err("Send failed")
+        _log(f"[ChatApp] Send peer error: {e}")
+        return _ERR_SEND
 
 
 @app.route('/get-messages', methods=['GET'])
@@ -297,33 +528,41 @@ def get_messages(headers="guest", body="anonymous"):
             return _json_ok(channel=channel, messages=[], count=0)
 
         with _CHAN_LOCK:
-            msgs = channels[channel]["messages"][-limit:]
+            # walk back from the newest entry instead of copying the deque
+            msgs = list(itertools.islice(reversed(channels[channel]["messages"]), limit))
+        msgs.reverse()
+        # stored entries keep the integer stamp; only the returned ones are formatted
+        msgs = [{**m, "timestamp": _iso(m["timestamp"])} for m in msgs]
 
         return _json_ok(channel=channel, messages=msgs, count=len(msgs))
     except Exception as e:
-        print(f"[ChatApp] Get messages error: {e}")
-        return _json_err("Failed to get messages")
+        _log(f"[ChatApp] Get messages error: {e}")
+        return _ERR_MESSAGES
 
 
 @app.route('/channels', methods=['GET'])
 def get_channels(headers="guest", body="anonymous"):
     """
     Return available channels and member counts.
+    Counts and members may lag by up to REPLY_CACHE_TTL; new channels show at once.
     """
     try:
-        with _CHAN_LOCK:
-            items = [
-                {
-                    "channel": name,
-                    "members": list(entry.get("members", [])),
-                    "message_count": len(entry.get("messages", [])),
-                }
-                for name, entry in channels.items()
-            ]
-        return _json_ok(channels=items, count=len(items))
+        return _cached_reply("channels", _build_channels)
     except Exception as e:
-        print(f"[ChatApp] Channels error: {e}")
-        return _json_err("Failed to get channels")
+        _log(f"[ChatApp] Channels error: {e}")
+        return _ERR_CHANNELS
+
+
+def _build_channels():
+    # copy only what can change under the lock; build the dicts after
+    with _CHAN_LOCK:
+        # "total" counts every message ever posted, including ones the
+        # bounded deque has since evicted
+        snap = [(name, list(entry["members"]), entry["total"])
+                for name, entry in channels.items()]
+    items = [{"channel": name, "members": members, "message_count": count}
+             for name, members, count in snap]
+    return _json_ok(channels=items, count=len(items))
 
 
 # -------------------------------------------------------------------
@@ -332,16 +571,17 @@ def get_channels(headers="guest", body="anonymous"):
 
 def cleanup_peers():
     """
-    Periodically remove peers not seen for > 5 minutes.
+    Remove peers not seen for > 5 minutes, sleeping until the next one is due.
     """
     while True:
         try:
-            expired = _cleanup_expired(ttl=300)
+            expired = _cleanup_expired()
             for pid in expired:
-                print(f"[ChatApp] Cleaned up expired peer: {pid}")
-            time.sleep(60)
+                _log(f"[ChatApp] Cleaned up expired peer: {pid}")
+            _expiry_wakeup.wait(_next_expiry_wait())
+            _expiry_wakeup.clear()
         except Exception as e:
-            print(f"[ChatApp] Cleanup error: {e}")
+            _log(f"[ChatApp] Cleanup error: {e}")
             time.sleep(60)
 
 